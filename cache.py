@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+cache.py
+Disk-backed response cache for OpenRouter requests.
+
+Responses are keyed by the SHA256 of the full request signature
+(model + messages + max_tokens) and stored in SQLite, so re-running a
+trial on an unchanged document returns in milliseconds instead of
+re-paying every token.
+
+Enable with TRIAL_BY_HEX_CACHE=1. Entries expire after
+TRIAL_CACHE_TTL_DAYS (default 30).
+
+Author: Eden Eldith & Claude Opus 4.5
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional
+
+CACHE_ENABLED = os.environ.get("TRIAL_BY_HEX_CACHE") == "1"
+CACHE_TTL_DAYS = float(os.environ.get("TRIAL_CACHE_TTL_DAYS", "30"))
+CACHE_PATH = Path.home() / ".trial_by_hex" / "cache.sqlite"
+
+# One shared connection used from whichever thread gets there first (the
+# review collection may run on a thread pool), so same-thread checking is
+# off and the lock serializes all access instead
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open (and lazily initialize) the cache database."""
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created REAL)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def request_key(model: str, messages: List[Dict], max_tokens: int) -> str:
+    """Deterministic SHA256 signature for a (model, messages, max_tokens) request."""
+    signature = json.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens},
+        sort_keys=True
+    )
+    return hashlib.sha256(signature.encode()).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for key, or None on miss/expiry/disabled."""
+    if not CACHE_ENABLED:
+        return None
+    cutoff = time.time() - CACHE_TTL_DAYS * 86400
+    with _lock:
+        row = _connect().execute(
+            "SELECT response FROM cache WHERE key=? AND created > ?",
+            (key, cutoff)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put(key: str, model: str, response: str) -> None:
+    """Store a response under key (no-op when the cache is disabled)."""
+    if not CACHE_ENABLED:
+        return
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, model, response, created) VALUES (?, ?, ?, ?)",
+            (key, model, response, time.time())
+        )
+        conn.commit()
@@ -9,44 +9,70 @@ Set OPENROUTER_API_KEY environment variable or use a .env file.
 Author: Eden Eldith & Claude Opus 4.5
 """
 import os
+import re
 import sys
 import json
+import time
+import atexit
+import random
+import asyncio
+import hashlib
 from pathlib import Path
 from typing import List, Dict
 from datetime import datetime
+from collections import defaultdict, deque
 
-# Load .env file if it exists (for API key)
-try:
-    from dotenv import load_dotenv
-    # Look for .env in script directory and current working directory
-    script_dir = Path(__file__).parent.resolve()
-    env_paths = [
-        script_dir / '.env',
-        Path.cwd() / '.env',
-    ]
-    for env_path in env_paths:
-        if env_path.exists():
-            load_dotenv(env_path)
-            break
-except ImportError:
-    pass  # python-dotenv not installed, rely on environment variable
+import cache
 
+# orjson (C extension) is markedly faster than stdlib json on the large
+# document-bearing payloads; fall back to stdlib when not installed
 try:
-    import requests
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
 except ImportError:
-    print("=" * 60)
-    print("ERROR: requests package not installed.")
-    print("=" * 60)
-    print("\nInstall with:")
-    print("  pip install requests")
-    print("\nOr install all dependencies:")
-    print("  pip install -r requirements.txt")
-    sys.exit(1)
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+# httpx is imported lazily in _get_client() so that running the script
+# without arguments (usage screen) stays fast; this name is filled in on
+# first use
+httpx = None
 
 # OpenRouter API configuration
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
 
+
+def _load_env_if_available():
+    """Load a .env file (if python-dotenv is installed) and re-read the key.
+
+    Deferred from import time so CLI startup doesn't pay for dotenv when
+    no review is actually being run.
+    """
+    global OPENROUTER_API_KEY
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass  # python-dotenv not installed, rely on environment variable
+    else:
+        # Look for .env in script directory and current working directory
+        script_dir = Path(__file__).parent.resolve()
+        env_paths = [
+            script_dir / '.env',
+            Path.cwd() / '.env',
+        ]
+        for env_path in env_paths:
+            if env_path.exists():
+                load_dotenv(env_path)
+                break
+    OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
+
 # Configure 6 diverse reviewer models/personas
 # Using different model families for true diversity of perspective
 # Mix of premium and cost-effective models
@@ -84,40 +110,10 @@ FALLBACK_MODELS = [
     "openai/gpt-5-nano",
 ]
 
-
-def openrouter_request(model: str, messages: List[Dict], max_tokens: int = 1500) -> str:
-    """Make a request to OpenRouter API."""
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "https://github.com/Eden-Eldith/Trial-by-Hex",
-        "X-Title": "Trial by Hex - Multi-Model Peer Review",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": model,
-        "messages": messages,
-        "max_tokens": max_tokens
-    }
-
-    response = requests.post(
-        OPENROUTER_BASE_URL,
-        headers=headers,
-        json=payload,
-        timeout=120
-    )
-    response.raise_for_status()
-
-    data = response.json()
-    return data['choices'][0]['message']['content']
-
-
-def get_review(content: str, persona: str, model: str) -> str:
-    """Get a single blind review from a specific model."""
-    messages = [
-        {
-            "role": "system",
-            "content": f"""You are a {persona} conducting a blind peer review.
+# Invariant review rubric, hoisted to module scope so each reviewer call
+# reuses the same string object instead of rebuilding a multi-KB f-string,
+# and so the cached prompt prefix stays byte-identical across calls
+REVIEW_RUBRIC = """You are conducting a blind peer review.
 
 Evaluate this work on:
 1. Technical accuracy
@@ -129,34 +125,9 @@ Evaluate this work on:
 Be specific. Cite sections. Provide actionable feedback.
 Do NOT reference author credentials or affiliations - this is blind review.
 Focus purely on the quality of the work itself."""
-        },
-        {
-            "role": "user",
-            "content": content
-        }
-    ]
 
-    try:
-        return openrouter_request(model, messages, max_tokens=1500)
-    except Exception as e:
-        # Try fallback models
-        for fallback in FALLBACK_MODELS:
-            try:
-                print(f"    Falling back to {fallback}...")
-                return openrouter_request(fallback, messages, max_tokens=1500)
-            except:
-                continue
-        raise e
-
-
-def synthesize_reviews(reviews: List[str], synthesis_model: str = "anthropic/claude-opus-4.5") -> str:
-    """Synthesize 6 reviews into actionable summary using Opus 4.5."""
-    combined = "\n\n---REVIEW---\n\n".join(reviews)
-
-    messages = [
-        {
-            "role": "system",
-            "content": """Synthesize these 6 blind reviews into a single actionable summary.
+# Fixed synthesis instructions (no interpolation, for the same reasons)
+SYNTHESIS_SYSTEM = """Synthesize these 6 blind reviews into a single actionable summary.
 
 OUTPUT FORMAT:
 ## High Consensus (4+ reviewers agree)
@@ -177,6 +148,466 @@ REVISE: Needs significant revision, re-review recommended
 REJECT: Fundamental issues need addressing
 
 Remove any credentialism-based dismissals. Focus on substance."""
+
+# Verdict extraction: one case-insensitive scan anchored to the VERDICT
+# section, so stray words like "bypass" elsewhere can't flip the result
+# (and no full-string .upper() copy of the synthesis is allocated)
+_VERDICT_RE = re.compile(
+    r'^\s*(?:##\s*)?VERDICT.*?\b(PASS|REVISE|REJECT)\b',
+    re.MULTILINE | re.IGNORECASE | re.DOTALL
+)
+
+# Documents longer than this (in characters) get chunked and map-reduced
+# per reviewer instead of being sent whole to every model
+CHUNK_THRESHOLD = int(os.environ.get("TRIAL_BY_HEX_CHUNK_THRESHOLD", "80000"))
+CHUNK_OVERLAP = 500
+
+# Cap concurrent OpenRouter requests so the fan-out (plus any retries)
+# stays under provider rate limits instead of triggering 429 cascades
+SEM = asyncio.Semaphore(int(os.environ.get("TRIAL_BY_HEX_CONCURRENCY", "6")))
+
+# Retries per model on transient failures before descending into
+# FALLBACK_MODELS; a 502/503 blip costs a short backoff here instead of
+# a full fallback round-trip
+MAX_RETRIES = 3
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Rolling latency samples per model, used to adapt request timeouts
+_LATENCIES: Dict[str, deque] = defaultdict(lambda: deque(maxlen=20))
+
+# Per-call metrics (latency + token accounting) gathered for the
+# end-of-run summary; without these, tuning timeouts/concurrency is blind
+_METRICS: List[Dict] = []
+
+
+def report_metrics():
+    """Write a per-call latency/token summary to stderr.
+
+    Set TRIAL_BY_HEX_METRICS_JSON=/path to also append the raw records
+    as JSONL for later analysis.
+    """
+    if not _METRICS:
+        return
+    sys.stderr.write("\nPer-call metrics:\n")
+    for m in _METRICS:
+        sys.stderr.write(
+            f"  {m['model']:40s} {m['latency_s']:6.2f}s  "
+            f"prompt={m['prompt_tokens']}  compl={m['completion_tokens']}  "
+            f"cached={m['cache_read_tokens']}\n"
+        )
+    metrics_path = os.environ.get("TRIAL_BY_HEX_METRICS_JSON")
+    if metrics_path:
+        with open(metrics_path, 'a', encoding='utf-8') as f:
+            for m in _METRICS:
+                f.write(json.dumps(m) + "\n")
+
+
+def adaptive_timeout(model: str) -> float:
+    """Timeout just above the model's observed median latency.
+
+    A flat 120s means one cold provider can stall a review slot for two
+    minutes even when its p50 is under 10s. With samples, use 2.5x the
+    median clamped to [10, 120]; without samples, the full 120s.
+    """
+    samples = _LATENCIES[model]
+    if not samples:
+        return 120.0
+    p50 = sorted(samples)[len(samples) // 2]
+    return min(120.0, max(10.0, 2.5 * p50))
+
+
+# Advertise brotli only when a decoder is importable — httpx passes
+# br-encoded bodies through undecoded otherwise, which would feed the SSE
+# parser binary garbage
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip"
+
+
+def openrouter_headers() -> Dict:
+    """Build the common OpenRouter request headers."""
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "HTTP-Referer": "https://github.com/Eden-Eldith/Trial-by-Hex",
+        "X-Title": "Trial by Hex - Multi-Model Peer Review",
+        "Content-Type": "application/json",
+        # Compressed bodies cut response transfer ~5x; httpx decompresses
+        # transparently
+        "Accept-Encoding": _ACCEPT_ENCODING
+    }
+
+
+# Shared HTTP/2 client: one TCP+TLS handshake per run, with all requests
+# multiplexed over a pooled connection to openrouter.ai
+_client = None
+
+
+def _get_client():
+    """Create the shared HTTP/2 client on first use."""
+    global httpx, _client
+    if _client is None:
+        try:
+            import httpx as _httpx
+        except ImportError:
+            print("=" * 60)
+            print("ERROR: httpx package not installed.")
+            print("=" * 60)
+            print("\nInstall with:")
+            print("  pip install 'httpx[http2]'")
+            print("\nOr install all dependencies:")
+            print("  pip install -r requirements.txt")
+            sys.exit(1)
+        httpx = _httpx
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            headers=openrouter_headers(),
+        )
+        atexit.register(lambda: asyncio.run(_client.aclose()))
+    return _client
+
+
+async def _warm_connection():
+    """Prime the pooled TLS connection so the first review skips the handshake.
+
+    Fired as a background task before the document is read, so the
+    TCP+TLS setup overlaps file I/O and banner printing. Best effort only.
+    """
+    try:
+        await _get_client().head("https://openrouter.ai/api/v1/models")
+    except Exception:
+        pass
+
+
+async def openrouter_request(model: str, messages: List[Dict], max_tokens: int = 1500,
+                             response_format: Dict = None) -> str:
+    """Make a request to OpenRouter API over the shared client."""
+    # Serve identical requests from the disk cache (TRIAL_BY_HEX_CACHE=1)
+    cache_key = cache.request_key(model, messages, max_tokens)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        # Stream tokens over SSE instead of blocking on the full completion,
+        # so slow/hung providers surface early instead of at the 120s timeout
+        "stream": True,
+        # Ask OpenRouter to report usage (incl. prompt-cache accounting) in
+        # the final SSE frame so cache_control pass-through can be verified
+        "usage": {"include": True}
+    }
+    if response_format is not None:
+        payload["response_format"] = response_format
+
+    client = _get_client()
+
+    # Hold the semaphore across retries of the same logical request so a
+    # retry burst can't re-violate the concurrency cap
+    async with SEM:
+        timeout_retries = 1  # retry the same model once on timeout before escalating
+        retry_delay = 0.0
+        for attempt in range(MAX_RETRIES):
+            if retry_delay:
+                # Back off out here, past the stream/timeout scopes — a
+                # Retry-After longer than the adaptive timeout would
+                # otherwise be aborted mid-sleep as a bogus TimeoutError
+                await asyncio.sleep(retry_delay)
+                retry_delay = 0.0
+            t0 = time.monotonic()
+            try:
+                async with asyncio.timeout(adaptive_timeout(model)):
+                    async with client.stream("POST", OPENROUTER_BASE_URL,
+                                             content=_json_dumps(payload)) as response:
+                        if response.status_code in RETRYABLE_STATUSES and attempt < MAX_RETRIES - 1:
+                            # Honor Retry-After if present (RFC 7231), else
+                            # exponential backoff with jitter, capped at 30s
+                            retry_after = float(response.headers.get("Retry-After", 0) or 0)
+                            retry_delay = max(retry_after, min(30, 2 ** attempt + random.random()))
+                            continue
+                        response.raise_for_status()
+                        chunks = []
+                        usage = {}
+                        async for raw_line in response.aiter_lines():
+                            line = raw_line.strip()
+                            if not line.startswith("data: "):
+                                continue  # SSE comments / keep-alive blank lines
+                            frame_data = line[len("data: "):]
+                            if frame_data == "[DONE]":
+                                break
+                            try:
+                                frame = _json_loads(frame_data)
+                            except ValueError:
+                                continue
+                            if 'error' in frame:
+                                # Provider failures arrive mid-stream with
+                                # HTTP 200; a dead stream must not pass as
+                                # a truncated-but-successful review
+                                raise RuntimeError(f"OpenRouter stream error from {model}: {frame['error']}")
+                            if frame.get('usage'):
+                                usage = frame['usage']
+                            choices = frame.get('choices')
+                            if not choices:
+                                continue  # usage-only frames
+                            delta = choices[0].get('delta', {}).get('content')
+                            if delta:
+                                chunks.append(delta)
+            except TimeoutError:
+                if timeout_retries:
+                    timeout_retries -= 1
+                    continue
+                raise
+            except httpx.TransportError:
+                # Connection resets / DNS blips: back off and retry before
+                # giving up on this model
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(min(30, 2 ** attempt + random.random()))
+                    continue
+                raise
+            elapsed = time.monotonic() - t0
+            _LATENCIES[model].append(elapsed)
+            # Confirm the shared rubric+document prefix actually deduplicated:
+            # nonzero cache reads mean the document was NOT re-prefilled
+            cache_read = usage.get('cache_read_input_tokens', 0)
+            cache_created = usage.get('cache_creation_input_tokens', 0)
+            if cache_read or cache_created:
+                print(f"    (prompt cache: {cache_read} tokens read, {cache_created} created)")
+            _METRICS.append({
+                "model": model,
+                "latency_s": round(elapsed, 3),
+                "prompt_tokens": usage.get('prompt_tokens', 0),
+                "completion_tokens": usage.get('completion_tokens', 0),
+                "cache_read_tokens": cache_read,
+                "cache_creation_tokens": cache_created,
+            })
+            result = "".join(chunks)
+            if result:
+                # An empty stream isn't worth 30 days of cache hits;
+                # leave it uncached so a re-run actually retries
+                cache.put(cache_key, model, result)
+            return result
+
+        # Retry budget exhausted on retryable statuses/timeouts; raising
+        # beats falling off the loop and returning (and memoizing) None
+        raise RuntimeError(f"OpenRouter request to {model} failed after {MAX_RETRIES} attempts")
+
+
+def build_review_messages(content: str, persona: str) -> List[Dict]:
+    """Build the review prompt for one reviewer.
+
+    Prompt layout matters for provider-side prompt caching: the invariant
+    rubric and the document come first as cacheable blocks (byte-identical
+    across all 6 reviewers), and only the persona varies after them, so
+    Anthropic/OpenRouter can reuse the KV cache for the expensive prefix.
+    """
+    return [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": REVIEW_RUBRIC,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": content,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": f"Persona: you are a {persona}."
+                }
+            ]
+        },
+        {
+            "role": "user",
+            "content": "Begin your blind review of the document above."
+        }
+    ]
+
+
+async def request_with_fallback(model: str, messages: List[Dict], max_tokens: int = 1500,
+                                response_format: Dict = None) -> str:
+    """Call the primary model, racing FALLBACK_MODELS if it fails."""
+    try:
+        return await openrouter_request(model, messages, max_tokens=max_tokens,
+                                        response_format=response_format)
+    except Exception as e:
+        # Race the fallbacks and keep the first success, instead of walking
+        # them one at a time (worst case drops from their summed latencies
+        # to the max of them)
+        print(f"    Racing fallbacks: {', '.join(FALLBACK_MODELS)}...")
+        pending = {
+            asyncio.create_task(openrouter_request(fallback, messages, max_tokens=max_tokens,
+                                                   response_format=response_format))
+            for fallback in FALLBACK_MODELS
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise e
+
+
+def split_document(content: str) -> List[str]:
+    """Split an oversized document into review-sized chunks.
+
+    Prefers Markdown '## ' heading boundaries, packing consecutive sections
+    into chunks under CHUNK_THRESHOLD; documents without headings fall back
+    to fixed character windows with a small overlap.
+    """
+    sections = content.split("\n## ")
+    if len(sections) > 1:
+        chunks = [sections[0]]
+        for section in sections[1:]:
+            section = "## " + section
+            if len(chunks[-1]) + len(section) < CHUNK_THRESHOLD:
+                chunks[-1] += "\n" + section
+            else:
+                chunks.append(section)
+        return chunks
+    return [
+        content[max(0, start - CHUNK_OVERLAP):start + CHUNK_THRESHOLD]
+        for start in range(0, len(content), CHUNK_THRESHOLD)
+    ]
+
+
+async def map_reduce_review(content: str, persona: str, model: str) -> str:
+    """Review a long document chunk by chunk, then merge the notes."""
+    chunks = split_document(content)
+    section_notes = await asyncio.gather(*[
+        request_with_fallback(model, build_review_messages(chunk, persona))
+        for chunk in chunks
+    ])
+
+    combine_messages = [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": REVIEW_RUBRIC,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": f"Persona: you are a {persona}."
+                }
+            ]
+        },
+        {
+            "role": "user",
+            "content": "You reviewed a long document section by section. "
+                       "Combine your per-section notes below into one coherent blind review.\n\n"
+                       + "\n\n---SECTION NOTES---\n\n".join(section_notes)
+        }
+    ]
+    return await request_with_fallback(model, combine_messages)
+
+
+# In-process memo for repeated (document, persona, model) reviews, e.g.
+# duplicate REVIEWERS entries or programmatic re-invocations in the same
+# interpreter (notebooks, retries after a partial failure). Keyed by a
+# short content hash rather than the document itself.
+_REVIEW_MEMO: Dict[tuple, str] = {}
+
+
+async def get_review(content: str, persona: str, model: str) -> str:
+    """Get a single blind review from a specific model."""
+    memo_key = (hashlib.sha1(content.encode()).hexdigest()[:16], persona, model)
+    memoized = _REVIEW_MEMO.get(memo_key)
+    if memoized is not None:
+        return memoized
+
+    if len(content) > CHUNK_THRESHOLD:
+        review = await map_reduce_review(content, persona, model)
+    else:
+        review = await request_with_fallback(model, build_review_messages(content, persona))
+    _REVIEW_MEMO[memo_key] = review
+    return review
+
+
+async def get_reviews_marshalled(content: str, personas: List[str],
+                                 model: str = "anthropic/claude-sonnet-4.5") -> List[str]:
+    """Produce the whole reviewer panel in a single API call.
+
+    Marshalling the personas into one prompt amortizes the per-call RTT
+    and document prefill that dominate with cheap models, at the cost of
+    true model diversity - hence opt-in via --marshalled.
+    """
+    persona_lines = "\n".join(f"{i+1}. {p}" for i, p in enumerate(personas))
+    messages = [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": REVIEW_RUBRIC,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": content,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": f"You will produce {len(personas)} independent blind reviews of the "
+                            f"document above, one from each persona below, with no "
+                            f"cross-references between them:\n{persona_lines}\n\n"
+                            f'Respond with a JSON object {{"reviews": [...]}} where "reviews" '
+                            f"is an array of exactly {len(personas)} review strings, in order."
+                }
+            ]
+        },
+        {
+            "role": "user",
+            "content": "Begin the panel review."
+        }
+    ]
+
+    raw = await request_with_fallback(model, messages, max_tokens=6000,
+                                      response_format={"type": "json_object"})
+    parsed = _json_loads(raw)
+    reviews = parsed.get("reviews") if isinstance(parsed, dict) else None
+    if not isinstance(reviews, list) or len(reviews) != len(personas):
+        raise ValueError(f"Marshalled panel did not return {len(personas)} reviews")
+    return [str(r) for r in reviews]
+
+
+async def synthesize_reviews(reviews: List[str],
+                             synthesis_model: str = "anthropic/claude-opus-4.5") -> str:
+    """Synthesize 6 reviews into actionable summary using Opus 4.5."""
+    combined = "\n\n---REVIEW---\n\n".join(reviews)
+
+    # The rubric never changes while the concatenated reviews do, so mark
+    # it as a cached prefix: repeat syntheses bill only the reviews at
+    # full prefill rate
+    messages = [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": SYNTHESIS_SYSTEM,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ]
         },
         {
             "role": "user",
@@ -184,11 +615,12 @@ Remove any credentialism-based dismissals. Focus on substance."""
         }
     ]
 
-    return openrouter_request(synthesis_model, messages, max_tokens=2000)
+    return await openrouter_request(synthesis_model, messages, max_tokens=2000)
 
 
-def trial_by_hex(input_file: str, output_file: str) -> Dict:
+async def trial_by_hex_async(input_file: str, output_file: str, marshalled: bool = False) -> Dict:
     """Run full trial by hex on a document."""
+    _load_env_if_available()
     if not OPENROUTER_API_KEY:
         print("=" * 60)
         print("ERROR: OPENROUTER_API_KEY not set!")
@@ -206,6 +638,10 @@ def trial_by_hex(input_file: str, output_file: str) -> Dict:
         print("  4. Create new API key")
         return {"passed": False, "synthesis": "API key not set"}
 
+    # Kick off the TLS handshake in the background while we read the
+    # document and print the banner
+    asyncio.create_task(_warm_connection())
+
     # Resolve input path (support both relative and absolute paths)
     input_path = Path(input_file).resolve()
     if not input_path.exists():
@@ -214,30 +650,84 @@ def trial_by_hex(input_file: str, output_file: str) -> Dict:
 
     content = input_path.read_text(encoding='utf-8')
 
+    # Content-addressed run cache: identical document bytes short-circuit
+    # straight to the prior reviews + synthesis (same opt-in flag and TTL
+    # as the response cache)
+    doc_hash = hashlib.sha256(content.encode()).hexdigest()
+    run_cache_path = Path.home() / ".trial_by_hex" / "runs" / f"{doc_hash}.json"
+    cached_run = None
+    if cache.CACHE_ENABLED and run_cache_path.exists():
+        age_days = (time.time() - run_cache_path.stat().st_mtime) / 86400
+        if age_days <= cache.CACHE_TTL_DAYS:
+            cached_run = json.loads(run_cache_path.read_text(encoding='utf-8'))
+
     print("=" * 60)
     print("  TRIAL BY HEX - Multi-Model Blind Peer Review")
     print("  Powered by OpenRouter (Claude, GPT, Gemini, Llama)")
     print("=" * 60)
     print(f"\nDocument: {input_path}")
-    print(f"Collecting 6 diverse blind reviews...\n")
-
-    reviews = []
-    for i, reviewer in enumerate(REVIEWERS):
-        model_short = reviewer['model'].split('/')[-1]
-        print(f"  [{i+1}/6] {model_short}: {reviewer['persona'][:40]}...")
-        try:
-            review = get_review(content, reviewer['persona'], reviewer['model'])
-            reviews.append(review)
-            print(f"        ✓ Complete")
-        except Exception as e:
-            print(f"        ✗ Error: {e}")
-            reviews.append(f"Review failed: {e}")
 
-    print("\nSynthesizing reviews with Claude Opus 4.5...")
-    synthesis = synthesize_reviews(reviews)
+    if cached_run is not None:
+        print("\nCache hit for this document, skipping LLM calls")
+        reviews: List[str] = cached_run['reviews']
+        synthesis = cached_run['synthesis']
+    else:
+        reviews = None
+        if marshalled:
+            print("Collecting 6 blind reviews via a single marshalled panel call...\n")
+            try:
+                reviews = await get_reviews_marshalled(content, [r['persona'] for r in REVIEWERS])
+                print("  ✓ Panel complete")
+            except ValueError as e:
+                # Models routinely fumble "exactly N strings" prompts;
+                # degrade to the per-reviewer path instead of crashing
+                print(f"  ✗ {e}; falling back to individual reviews")
+
+        if reviews is None:
+            print(f"Collecting 6 diverse blind reviews concurrently...\n")
+
+            for i, reviewer in enumerate(REVIEWERS):
+                model_short = reviewer['model'].split('/')[-1]
+                print(f"  [{i+1}/6] {model_short}: {reviewer['persona'][:40]}...")
+
+            async def run_review(slot: int, reviewer: Dict):
+                try:
+                    return slot, await get_review(content, reviewer['persona'], reviewer['model'])
+                except Exception as e:
+                    return slot, f"Review failed: {e}"
+
+            tasks = [
+                asyncio.create_task(run_review(i, reviewer))
+                for i, reviewer in enumerate(REVIEWERS)
+            ]
+
+            # Consume reviews as they finish for live progress, then hand
+            # the full set to synthesis (which needs every review, so
+            # there is nothing useful to overlap it with)
+            reviews = [""] * len(REVIEWERS)
+            for finished in asyncio.as_completed(tasks):
+                slot, review = await finished
+                reviews[slot] = review
+                model_short = REVIEWERS[slot]['model'].split('/')[-1]
+                marker = "✗" if review.startswith("Review failed:") else "✓"
+                print(f"  {marker} {model_short} complete")
+
+        print("\nSynthesizing reviews with Claude Opus 4.5...")
+        synthesis = await synthesize_reviews(reviews)
+
+    # Never persist a run containing failed reviews — a cached broken
+    # report would short-circuit every retry for the next TTL window
+    if cached_run is None and cache.CACHE_ENABLED \
+            and not any(r.startswith("Review failed:") for r in reviews):
+        run_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        run_cache_path.write_text(
+            json.dumps({"reviews": reviews, "synthesis": synthesis}),
+            encoding='utf-8'
+        )
 
     # Determine verdict
-    passed = "PASS" in synthesis.upper()
+    verdict_match = _VERDICT_RE.search(synthesis)
+    passed = bool(verdict_match) and verdict_match.group(1).upper() == "PASS"
 
     # Resolve output path
     output_path = Path(output_file).resolve()
@@ -245,7 +735,10 @@ def trial_by_hex(input_file: str, output_file: str) -> Dict:
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    output_path.write_text(f"""# Trial by Hex Review
+    # Stream sections to disk instead of materializing the whole report as
+    # one concatenated string (reviews of long documents can run to MBs)
+    with output_path.open('w', encoding='utf-8') as f:
+        f.write(f"""# Trial by Hex Review
 
 **Document:** {input_path.name}
 **Date:** {datetime.now().isoformat()}
@@ -256,38 +749,41 @@ def trial_by_hex(input_file: str, output_file: str) -> Dict:
 
 ## Synthesized Review
 
-{synthesis}
-
----
-
-## Individual Reviews
-
-""" + "".join(f"""### Reviewer {i+1}: {REVIEWERS[i]['model'].split('/')[-1]}
-**Persona:** {REVIEWERS[i]['persona']}
-
-{r}
-
----
-
-""" for i, r in enumerate(reviews)), encoding='utf-8')
+""")
+        f.write(synthesis)
+        f.write("\n\n---\n\n## Individual Reviews\n\n")
+        for i, review in enumerate(reviews):
+            f.write(f"### Reviewer {i+1}: {REVIEWERS[i]['model'].split('/')[-1]}\n")
+            f.write(f"**Persona:** {REVIEWERS[i]['persona']}\n\n")
+            f.write(review)
+            f.write("\n\n---\n\n")
 
     print(f"\n{'=' * 60}")
     print(f"  Review saved to: {output_path}")
     print(f"  Verdict: {'✓ PASSED' if passed else '⚠ NEEDS REVISION'}")
     print(f"{'=' * 60}")
 
+    report_metrics()
+
     return {"passed": passed, "synthesis": synthesis}
 
 
+def trial_by_hex(input_file: str, output_file: str, marshalled: bool = False) -> Dict:
+    """Synchronous entry point wrapping the async pipeline."""
+    return asyncio.run(trial_by_hex_async(input_file, output_file, marshalled=marshalled))
+
+
 def print_usage():
     """Print usage information."""
     print("=" * 60)
     print("  TRIAL BY HEX - Multi-Model Blind Peer Review")
     print("=" * 60)
-    print("\nUsage: python trial_by_hex.py <input_file> <output_file>")
+    print("\nUsage: python trial_by_hex.py <input_file> <output_file> [--marshalled]")
     print("\nExamples:")
     print('  python trial_by_hex.py ./thesis.md ./thesis_review.md')
     print('  python trial_by_hex.py "path/to/document.txt" "path/to/review.md"')
+    print("\nOptions:")
+    print("  --marshalled   One API call for the whole panel (cheaper, less diverse)")
     print("\nReviewers (6 diverse models):")
     for r in REVIEWERS:
         print(f"  • {r['model']}: {r['persona']}")
@@ -298,8 +794,9 @@ def print_usage():
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
         print_usage()
         sys.exit(1)
 
-    trial_by_hex(sys.argv[1], sys.argv[2])
+    trial_by_hex(args[0], args[1], marshalled="--marshalled" in sys.argv)
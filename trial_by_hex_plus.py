@@ -8,13 +8,46 @@ Set OPENROUTER_API_KEY environment variable or use a .env file.
 
 Author: Eden Eldith & Claude Opus 4.5
 """
+import io
 import os
 import sys
 import json
+import time
+import random
+import asyncio
+import hashlib
+import textwrap
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
 from pathlib import Path
 from typing import List, Dict
 from datetime import datetime
 
+import cache
+
+# orjson (C extension) is markedly faster than stdlib json on the large
+# document-bearing payloads; fall back to stdlib when not installed
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+# google-re2 compiles the fixed verdict grammar to a true DFA (linear-time
+# match); stdlib re is a drop-in fallback
+try:
+    import re2 as re
+except ImportError:
+    import re
+
 # Load .env file if it exists (for API key)
 try:
     from dotenv import load_dotenv
@@ -33,6 +66,8 @@ except ImportError:
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("=" * 70)
     print("ERROR: requests package not installed.")
@@ -43,9 +78,49 @@ except ImportError:
     print("  pip install -r requirements.txt")
     sys.exit(1)
 
+# httpx with HTTP/2 powers the concurrent collection phase — the fan-out
+# calls multiplex as streams over a single TCP+TLS connection; without it
+# the reviews still run in parallel on a thread pool over the shared Session
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # OpenRouter API configuration
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
-OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
+
+# One key via OPENROUTER_API_KEY, or several via OPENROUTER_API_KEYS
+# (comma-separated). With n keys, requests round-robin across them for
+# roughly n-times the aggregate rate limit.
+API_KEYS = [k.strip() for k in os.environ.get('OPENROUTER_API_KEYS', '').split(',') if k.strip()] \
+    or [os.environ.get('OPENROUTER_API_KEY')]
+OPENROUTER_API_KEY = API_KEYS[0]
+_key_cycle = itertools.cycle(API_KEYS)
+
+
+def next_api_key() -> str:
+    """Next API key in round-robin order."""
+    return next(_key_cycle)
+
+
+# Set by --no-cache: skip cache reads (forced refresh) while still
+# storing fresh responses for later runs
+CACHE_BYPASS = False
+
+# Pooled keep-alive session for the synchronous path: the TCP+TLS
+# handshake is paid once and reused across calls, and transient
+# failures (429/5xx) are retried with backoff at the transport layer
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+    ),
+))
 
 # Original 6 reviewers
 ORIGINAL_REVIEWERS = [
@@ -405,9 +480,127 @@ Output format:
     },
 ]
 
+def _build_reviewer_part(reviewer: Dict) -> str:
+    """Render the reviewer-specific tail of the system prompt."""
+    if "name" in reviewer:
+        # Plus reviewer with specialized persona
+        return f"""You are {reviewer['name']}, a {reviewer['persona']}
+
+Focus ONLY on your specialized domain."""
+    # Original reviewer
+    return f"""You are a {reviewer['persona']}.
+
+Evaluate this work on:
+1. Technical accuracy
+2. Clarity of argument
+3. Evidence quality
+4. Novel contribution
+5. Weaknesses and gaps"""
+
+
+# Normalize the triple-quoted personas once at load: stray indentation and
+# surrounding whitespace would otherwise ship (and be billed) in every
+# request body for the life of the process
+for _reviewer in PLUS_REVIEWERS:
+    _reviewer["persona"] = textwrap.dedent(_reviewer["persona"]).strip()
+
+# Known context windows (tokens). Models not listed get a conservative
+# default so oversized documents are trimmed rather than bounced with a 400.
+MODEL_CTX = {
+    "anthropic/claude-opus-4.5": 200_000,
+    "anthropic/claude-sonnet-4.5": 200_000,
+    "anthropic/claude-haiku-4.5": 200_000,
+    "openai/gpt-5.1": 128_000,
+    "openai/gpt-5-mini": 128_000,
+    "openai/gpt-5-nano": 128_000,
+    "google/gemini-3-pro-preview": 1_000_000,
+    "x-ai/grok-4.1-fast:free": 131_072,
+    "deepseek/deepseek-chat-v3.1": 131_072,
+}
+DEFAULT_CTX = 32_000
+
+# tiktoken gives exact token counts when installed; otherwise estimate
+# at ~4 characters per token
+try:
+    import tiktoken
+    _ENCODER = tiktoken.get_encoding("cl100k_base")
+
+    def len_tokens(text: str) -> int:
+        return len(_ENCODER.encode(text))
+except ImportError:
+    def len_tokens(text: str) -> int:
+        return len(text) // 4
+
+
+def truncate_for_model(content: str, model: str, system_tokens: int,
+                       max_tokens: int) -> str:
+    """Middle-out truncate the document to the model's context budget.
+
+    Keeps the head and tail (where theses front-load claims and close
+    with conclusions) and elides the middle with an explicit marker so
+    the reviewer knows material was cut.
+    """
+    budget = MODEL_CTX.get(model, DEFAULT_CTX) - system_tokens - max_tokens - 512
+    doc_tokens = len_tokens(content)
+    if doc_tokens <= budget:
+        return content
+
+    keep_chars = max(budget, 1024) * 4
+    head = content[:keep_chars // 2]
+    tail = content[len(content) - keep_chars // 2:]
+    print(f"    (truncating document for {model}: ~{doc_tokens} -> ~{budget} tokens)")
+    return (head
+            + f"\n\n[... ~{doc_tokens - budget} tokens elided to fit the context window ...]\n\n"
+            + tail)
+
+
+# Shared review preamble, byte-identical for all 12 reviewers so the
+# provider hashes (and caches) the same prompt prefix for every call
+COMMON_SYSTEM_PREAMBLE = """You are conducting a blind peer review.
+
+Be specific. Cite sections. Provide actionable feedback.
+Do NOT reference author credentials or affiliations - this is blind review.
+Focus purely on the quality of the work itself."""
+
+# Reviewer prompts never change at runtime, so render each one once here
+# instead of re-branching on "name" and re-formatting per call. The static
+# JSON framing around the document is pre-encoded to bytes at the same time,
+# so the hot path only ever serializes the document itself. Finally the
+# dicts are frozen so nothing mutates shared reviewer state across 12
+# parallel tasks.
+for _reviewer in ORIGINAL_REVIEWERS + PLUS_REVIEWERS:
+    _part = _build_reviewer_part(_reviewer)
+    _reviewer["_reviewer_part"] = _part
+    _reviewer["_system_tokens"] = len_tokens(COMMON_SYSTEM_PREAMBLE) + len_tokens(_part)
+    _reviewer["_payload_prefix"] = (
+        '{"model":%s,"messages":[{"role":"system","content":[{"type":"text","text":%s,'
+        '"cache_control":{"type":"ephemeral"}},{"type":"text","text":'
+        % (json.dumps(_reviewer["model"]), json.dumps(COMMON_SYSTEM_PREAMBLE))
+    ).encode()
+    _reviewer["_payload_suffix"] = (
+        ',"cache_control":{"type":"ephemeral"}},{"type":"text","text":%s}]},'
+        '{"role":"user","content":"Begin your blind review of the document above."}],'
+        '"max_tokens":2000,"stream":true}' % json.dumps(_part)
+    ).encode()
+ORIGINAL_REVIEWERS = [MappingProxyType(r) for r in ORIGINAL_REVIEWERS]
+PLUS_REVIEWERS = [MappingProxyType(r) for r in PLUS_REVIEWERS]
+
 # Combined list
 REVIEWERS = ORIGINAL_REVIEWERS + PLUS_REVIEWERS
 
+
+def encode_review_body(reviewer: Dict, doc: str) -> bytes:
+    """Assemble a request body from the reviewer's pre-encoded JSON framing.
+
+    Only the (possibly truncated) document is serialized per call; the
+    model, preamble, reviewer part and payload scaffolding were encoded
+    once at module load.
+    """
+    return (reviewer["_payload_prefix"]
+            + _json_dumps(doc)
+            + reviewer["_payload_suffix"])
+
+
 # Fallback models if primary ones fail
 FALLBACK_MODELS = [
     "x-ai/grok-4.1-fast:free",
@@ -415,86 +608,647 @@ FALLBACK_MODELS = [
     "openai/gpt-5-nano",
 ]
 
+# --- Health-probed model routing ---------------------------------------
+# One cheap GET against the models endpoint tells us up front which models
+# OpenRouter can currently serve, so a reviewer on a down model is rerouted
+# once instead of every review paying the full serial fallback cascade.
 
-def openrouter_request(model: str, messages: List[Dict], max_tokens: int = 2000) -> str:
-    """Make a request to OpenRouter API."""
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+HEALTH_PROBE_TTL = 60.0  # seconds before the probe result goes stale
+
+_health_probe = {"models": None, "fetched": 0.0}
+_unhealthy: set = set()
+
+# Every model this script can route to, in declaration order
+_KNOWN_MODELS = list(dict.fromkeys(
+    [r['model'] for r in REVIEWERS] + FALLBACK_MODELS
+))
+
+
+def get_available_models() -> set:
+    """Model ids OpenRouter currently serves, cached for HEALTH_PROBE_TTL.
+
+    Returns an empty set when the probe itself fails, which the router
+    treats as "no information" rather than "everything is down".
+    """
+    now = time.time()
+    if _health_probe["models"] is None or now - _health_probe["fetched"] > HEALTH_PROBE_TTL:
+        try:
+            response = SESSION.get(OPENROUTER_MODELS_URL, timeout=5)
+            response.raise_for_status()
+            _health_probe["models"] = {m["id"] for m in response.json().get("data", [])}
+        except Exception:
+            _health_probe["models"] = set()
+        _health_probe["fetched"] = now
+    return _health_probe["models"]
+
+
+def mark_unhealthy(model: str) -> None:
+    """Take a model out of routing for the rest of this run (e.g. on 5xx)."""
+    _unhealthy.add(model)
+
+
+def route_model(model: str) -> str:
+    """Pick the best currently-healthy model for a reviewer slot.
+
+    Prefers the primary, then same-vendor alternatives (an Anthropic
+    persona stays on Anthropic models when possible), then the cross-vendor
+    fallbacks. Uses the cached probe result only — never blocks on a fresh
+    probe mid-collection.
+    """
+    vendor = model.split('/')[0] + '/'
+    candidates = [model]
+    candidates += [m for m in _KNOWN_MODELS if m != model and m.startswith(vendor)]
+    candidates += [m for m in FALLBACK_MODELS
+                   if m != model and not m.startswith(vendor)]
+
+    available = _health_probe["models"] or set()
+    for candidate in candidates:
+        if candidate in _unhealthy:
+            continue
+        if available and candidate not in available:
+            continue
+        return candidate
+    return model  # nothing looks healthy; try the primary anyway
+
+
+class RateLimiter:
+    """Token bucket limiting requests-per-minute and tokens-per-minute.
+
+    Requests wait for capacity up front instead of firing calls that the
+    provider will 429, so retry storms never start and throughput sits
+    just under the limit.
+    """
+
+    def __init__(self, rpm_capacity: int, tpm_capacity: int):
+        self.rpm_capacity = rpm_capacity
+        self.tpm_capacity = tpm_capacity
+        self.available_requests = float(rpm_capacity)
+        self.available_tokens = float(tpm_capacity)
+        self.last_refill = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = max(0.0, now - self.last_refill)
+        self.last_refill = now
+        self.available_requests = min(
+            float(self.rpm_capacity),
+            self.available_requests + self.rpm_capacity * elapsed / 60.0)
+        self.available_tokens = min(
+            float(self.tpm_capacity),
+            self.available_tokens + self.tpm_capacity * elapsed / 60.0)
+
+    async def acquire(self, n_requests: int, n_tokens: int):
+        """Sleep until the bucket can cover n_requests and n_tokens."""
+        # A request bigger than the bucket itself would otherwise wait
+        # forever; let it through at full-bucket cost instead
+        n_requests = min(n_requests, self.rpm_capacity)
+        n_tokens = min(n_tokens, self.tpm_capacity)
+        while True:
+            self._refill()
+            if (self.available_requests >= n_requests
+                    and self.available_tokens >= n_tokens):
+                self.available_requests -= n_requests
+                self.available_tokens -= n_tokens
+                return
+            wait = 60.0 * max(
+                (n_requests - self.available_requests) / self.rpm_capacity,
+                (n_tokens - self.available_tokens) / self.tpm_capacity)
+            await asyncio.sleep(min(max(wait, 0.05), 30.0))
+
+    def drain(self, seconds: float):
+        """Empty the bucket for roughly `seconds` (after a 429 Retry-After)."""
+        self._refill()
+        self.available_requests = -self.rpm_capacity * seconds / 60.0
+        self.available_tokens = min(self.available_tokens, 0.0)
+
+
+# Conservative per-provider budgets; OpenRouter enforces its own limits
+# upstream so these just keep the 12-way fan-out from bursting
+RATE_LIMITS = {
+    "anthropic/": (30, 400_000),
+    "openai/": (60, 450_000),
+    "google/": (60, 400_000),
+}
+DEFAULT_RATE_LIMIT = (30, 200_000)
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Limiter for the model's provider prefix (anthropic/, openai/, ...)."""
+    prefix = model.split('/')[0] + '/'
+    if prefix not in _limiters:
+        rpm, tpm = RATE_LIMITS.get(prefix, DEFAULT_RATE_LIMIT)
+        # Budgets scale with the number of keys being round-robined
+        n_keys = len(API_KEYS)
+        _limiters[prefix] = RateLimiter(rpm * n_keys, tpm * n_keys)
+    return _limiters[prefix]
+
+
+def openrouter_headers() -> Dict:
+    """Build the common OpenRouter request headers."""
+    return {
+        "Authorization": f"Bearer {next_api_key()}",
         "HTTP-Referer": "https://github.com/Eden-Eldith/Trial-by-Hex",
         "X-Title": "Trial by Hex+ - Enhanced Multi-Model Peer Review",
         "Content-Type": "application/json"
     }
 
-    payload = {
-        "model": model,
-        "messages": messages,
-        "max_tokens": max_tokens
-    }
 
-    response = requests.post(
+def openrouter_request(model: str, messages: List[Dict], max_tokens: int = 2000,
+                       on_token=None, response_format: Dict = None,
+                       body: bytes = None) -> str:
+    """Make a streaming request to OpenRouter API.
+
+    Tokens are accumulated from SSE frames as they arrive; pass on_token
+    to observe each content delta for live progress. A pre-encoded body
+    (see encode_review_body) is sent as-is, skipping payload serialization.
+    """
+    headers = openrouter_headers()
+
+    if body is None:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        if response_format is not None:
+            payload["response_format"] = response_format
+        body = _json_dumps(payload)
+
+    response = SESSION.post(
         OPENROUTER_BASE_URL,
         headers=headers,
-        json=payload,
-        timeout=180  # Longer timeout for complex analysis
+        data=body,
+        timeout=180,  # Longer timeout for complex analysis
+        stream=True
     )
     response.raise_for_status()
 
-    data = response.json()
-    return data['choices'][0]['message']['content']
+    chunks = []
+    for line in response.iter_lines(decode_unicode=True):
+        delta = _parse_sse_delta(line)
+        if delta is None:
+            break
+        if delta:
+            chunks.append(delta)
+            if on_token:
+                on_token(delta)
+    return "".join(chunks)
+
+
+def _parse_sse_delta(line: str):
+    """Extract the content delta from one SSE line.
+
+    Returns the delta text ('' when the frame carries none), or None on
+    the [DONE] sentinel.
+    """
+    line = (line or "").strip()
+    if not line.startswith("data: "):
+        return ""
+    frame_data = line[len("data: "):]
+    if frame_data == "[DONE]":
+        return None
+    try:
+        frame = _json_loads(frame_data)
+    except ValueError:
+        return ""
+    if 'error' in frame:
+        # Provider failures arrive mid-stream with HTTP 200; a dead stream
+        # must not pass as a truncated-but-successful review
+        raise RuntimeError(f"OpenRouter stream error: {frame['error']}")
+    choices = frame.get('choices')
+    if not choices:
+        return ""  # usage-only frames
+    return choices[0].get('delta', {}).get('content') or ""
+
+
+def build_review_messages(content: str, reviewer: Dict, model: str = None) -> List[Dict]:
+    """Build the review prompt for one reviewer.
+
+    Ordered for provider-side prompt caching: the shared preamble and the
+    document lead as cache_control blocks identical across all 12
+    reviewers, and only the reviewer-specific part varies after them, so
+    the expensive document prefill is served from KV cache on reviewers
+    2-12 and on re-runs.
+    """
+    # Rendered once at module load; the hot path is just a dict lookup
+    reviewer_part = reviewer["_reviewer_part"]
+
+    # Trim the document to this model's context budget before dispatch
+    # (model may differ from reviewer['model'] when the router stepped in)
+    system_tokens = len_tokens(COMMON_SYSTEM_PREAMBLE) + len_tokens(reviewer_part)
+    content = truncate_for_model(content, model or reviewer['model'], system_tokens, 2000)
+
+    return [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": COMMON_SYSTEM_PREAMBLE,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": content,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": reviewer_part
+                }
+            ]
+        },
+        {"role": "user", "content": "Begin your blind review of the document above."}
+    ]
 
 
 def get_review(content: str, reviewer: Dict) -> str:
-    """Get a single blind review from a specific model."""
-    # Check if this is an original reviewer or plus reviewer
-    if "name" in reviewer:
-        # Plus reviewer with specialized persona
-        system_prompt = f"""You are {reviewer['name']}, a {reviewer['persona']}
+    """Get a single blind review, routed to the best healthy model.
+
+    The router already steers around models the health probe flagged, so
+    a failure here marks the model unhealthy for the rest of the run and
+    reroutes once — no serial walk through every fallback per review.
+    """
+    last_error = None
+    tried = set()
+    for _ in range(3):
+        model = route_model(reviewer['model'])
+        if model in tried:
+            break  # router has nothing new to offer
+        tried.add(model)
+
+        if model == reviewer['model']:
+            # Routed to the primary: the payload framing is pre-encoded,
+            # so only the document gets serialized here
+            doc = truncate_for_model(content, model, reviewer["_system_tokens"], 2000)
+            body = encode_review_body(reviewer, doc)
+            messages = None
+            key = hashlib.sha256(body).hexdigest()
+        else:
+            body = None
+            messages = build_review_messages(content, reviewer, model=model)
+            key = cache.request_key(model, messages, 2000)
+
+        # Identical (model, prompt, document) requests come back from the
+        # local SQLite cache instead of being re-billed (TRIAL_BY_HEX_CACHE=1)
+        if not CACHE_BYPASS:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
 
-You are conducting a blind peer review. Focus ONLY on your specialized domain.
-Do NOT reference author credentials or affiliations - this is blind review.
-Be specific. Cite sections. Provide actionable feedback."""
-    else:
-        # Original reviewer
-        system_prompt = f"""You are a {reviewer['persona']} conducting a blind peer review.
+        try:
+            review = openrouter_request(model, messages, max_tokens=2000, body=body)
+            if review:  # never cache an empty stream
+                cache.put(key, model, review)
+            return review
+        except Exception as e:
+            last_error = e
+            mark_unhealthy(model)
+            print(f"    {model} failed; rerouting...")
+    raise last_error
 
-Evaluate this work on:
-1. Technical accuracy
-2. Clarity of argument
-3. Evidence quality
-4. Novel contribution
-5. Weaknesses and gaps
 
-Be specific. Cite sections. Provide actionable feedback.
-Do NOT reference author credentials or affiliations - this is blind review.
-Focus purely on the quality of the work itself."""
+async def openrouter_request_async(client: "httpx.AsyncClient", model: str,
+                                   messages: List[Dict], max_tokens: int = 2000,
+                                   on_token=None, response_format: Dict = None) -> str:
+    """Async variant of openrouter_request.
 
+    Calls sharing the client are multiplexed as HTTP/2 streams over a
+    single connection rather than opening one socket each.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "stream": True
+    }
+    if response_format is not None:
+        payload["response_format"] = response_format
+
+    # Per-request Authorization override so concurrent calls round-robin
+    # across all configured keys (client default headers carry the rest,
+    # including Content-Type); content= keeps serialization on orjson
+    async with client.stream("POST", OPENROUTER_BASE_URL, content=_json_dumps(payload),
+                             headers={"Authorization": f"Bearer {next_api_key()}"}) as response:
+        response.raise_for_status()
+        chunks = []
+        async for line in response.aiter_lines():
+            delta = _parse_sse_delta(line)
+            if delta is None:
+                break
+            if delta:
+                chunks.append(delta)
+                if on_token:
+                    on_token(delta)
+
+    return "".join(chunks)
+
+
+async def get_review_async(client: "httpx.AsyncClient", content: str, reviewer: Dict) -> str:
+    """Async variant of get_review for the concurrent collection phase.
+
+    Capacity is acquired from the provider's token bucket before each
+    attempt, and transient failures are retried on the same model with
+    jittered exponential backoff rather than blindly cascading through
+    fallback models.
+    """
+    model = route_model(reviewer['model'])
+    messages = build_review_messages(content, reviewer, model=model)
+
+    # Identical (model, prompt, document) requests come back from the
+    # local SQLite cache instead of being re-billed (TRIAL_BY_HEX_CACHE=1)
+    key = cache.request_key(model, messages, 2000)
+    if not CACHE_BYPASS:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter(model)
+    # Rough prompt-size estimate for the token bucket (~4 chars/token plus
+    # the system prompt), based on the truncated document actually being
+    # sent — the raw input can dwarf both the context and the bucket
+    est_prompt_tokens = len(messages[0]['content'][1]['text']) // 4 + 1000
+
+    last_error = None
+    for attempt in range(5):
+        await limiter.acquire(1, est_prompt_tokens + 2000)
+        try:
+            review = await openrouter_request_async(client, model, messages, max_tokens=2000)
+            if review:  # never cache an empty stream
+                cache.put(key, model, review)
+            return review
+        except httpx.HTTPStatusError as e:
+            last_error = e
+            status = e.response.status_code
+            if status == 429:
+                # Drain the bucket so sibling reviewers stop hammering
+                # this provider for the advertised window
+                retry_after = float(e.response.headers.get('Retry-After', 0) or 0)
+                if retry_after:
+                    limiter.drain(retry_after)
+            elif status in (500, 502, 503, 504):
+                # Persistent server error: pull this model out of routing
+                # and retry on the router's next-best pick
+                mark_unhealthy(model)
+                rerouted = route_model(reviewer['model'])
+                if rerouted != model:
+                    model = rerouted
+                    messages = build_review_messages(content, reviewer, model=model)
+                    key = cache.request_key(model, messages, 2000)
+                    limiter = get_rate_limiter(model)
+                    est_prompt_tokens = len(messages[0]['content'][1]['text']) // 4 + 1000
+            else:
+                raise  # 4xx other than 429 won't heal on retry
+        except (httpx.TransportError, asyncio.TimeoutError) as e:
+            last_error = e
+        await asyncio.sleep(min(30, 2 ** attempt + random.random()))
+    raise last_error
+
+
+async def get_grouped_reviews_async(client: "httpx.AsyncClient", content: str,
+                                    model: str, idxs: List[int]) -> Dict[int, str]:
+    """Fetch every review for reviewers sharing one model in a single request.
+
+    Four of the twelve models carry two personas each, so batching them
+    halves those HTTP round trips and bills the document prefill once per
+    provider instead of once per reviewer. The model returns a JSON object
+    keyed review_<idx>; any failure (transport error, refused structured
+    output, malformed JSON) raises so the caller can fall back to the
+    per-reviewer path.
+    """
+    labels = {i: f"review_{i}" for i in idxs}
+    roster = "\n\n".join(
+        f"[{labels[i]}]\n{REVIEWERS[i]['_reviewer_part']}" for i in idxs
+    )
+    instruction = (
+        f"You will write {len(idxs)} independent blind reviews of the document above, "
+        "one per persona below. Do not let one persona's judgment leak into another's. "
+        "Respond with a single JSON object whose keys are exactly "
+        f"{sorted(labels.values())} and whose values are the full markdown review "
+        f"text for that persona.\n\n{roster}"
+    )
+    max_tokens = 2000 * len(idxs)
+    system_tokens = len_tokens(COMMON_SYSTEM_PREAMBLE) + len_tokens(instruction)
+    doc = truncate_for_model(content, model, system_tokens, max_tokens)
     messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": content}
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": COMMON_SYSTEM_PREAMBLE,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": doc,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": instruction
+                }
+            ]
+        },
+        {"role": "user", "content": "Begin your blind reviews of the document above."}
     ]
 
-    try:
-        return openrouter_request(reviewer['model'], messages, max_tokens=2000)
-    except Exception as e:
-        # Try fallback models
-        for fallback in FALLBACK_MODELS:
+    key = cache.request_key(model, messages, max_tokens)
+    raw = None if CACHE_BYPASS else cache.get(key)
+    from_cache = raw is not None
+    if raw is None:
+        limiter = get_rate_limiter(model)
+        await limiter.acquire(1, len(doc) // 4 + 1000 + max_tokens)
+        raw = await openrouter_request_async(
+            client, model, messages, max_tokens=max_tokens,
+            response_format={"type": "json_object"}
+        )
+
+    parsed = _json_loads(raw)
+    grouped = {i: parsed[labels[i]] for i in idxs}
+    if not from_cache:
+        # Persist only once the response proved complete — a malformed or
+        # key-dropping reply cached for the full TTL could never heal
+        cache.put(key, model, raw)
+    return grouped
+
+
+async def _collect_reviews(content: str, partial_path: Path) -> List[str]:
+    """Fan out all 12 review calls concurrently over one HTTP/2 client.
+
+    Wall time becomes roughly the slowest single review instead of the
+    sum of all 12 (each up to 180s). Each completed review is appended
+    to a .partial.jsonl sidecar as it arrives, so a crashed run can be
+    restarted without re-paying for the reviews that already finished;
+    entries are tagged with the document hash so stale logs from a
+    different document are ignored.
+    """
+    doc_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    done: Dict[int, str] = {}
+    # --no-cache means fresh reviews, so a leftover sidecar must not
+    # short-circuit them
+    if partial_path.exists() and not CACHE_BYPASS:
+        for line in partial_path.read_text(encoding='utf-8').splitlines():
             try:
-                print(f"    Falling back to {fallback}...")
-                return openrouter_request(fallback, messages, max_tokens=2000)
-            except:
-                continue
-        raise e
-
-
-def synthesize_reviews(reviews: List[str], reviewer_info: List[Dict], synthesis_model: str = "anthropic/claude-opus-4.5") -> str:
-    """Synthesize all reviews into actionable summary using Opus 4.5."""
-    # Format reviews with reviewer identity
-    formatted_reviews = []
-    for i, (review, reviewer) in enumerate(zip(reviews, reviewer_info)):
-        name = reviewer.get('name', f"Reviewer {i+1}")
-        formatted_reviews.append(f"### {name}\n{review}")
+                entry = _json_loads(line)
+            except ValueError:
+                continue  # truncated write from a crashed run
+            if entry.get('doc') == doc_hash:
+                done[entry['idx']] = entry['review']
+        if done:
+            print(f"  Resuming: {len(done)} review(s) recovered from {partial_path.name}\n")
+
+    reviews: List[str] = [""] * len(REVIEWERS)
+    for idx, review in done.items():
+        if idx < len(reviews):
+            reviews[idx] = review
+
+    async def run_review(client, idx: int, reviewer: Dict):
+        try:
+            return idx, await get_review_async(client, content, reviewer), True
+        except Exception as e:
+            return idx, f"Review failed: {e}", False
+
+    async def run_single(client, idx: int):
+        return [await run_review(client, idx, REVIEWERS[idx])]
 
-    combined = "\n\n---REVIEW---\n\n".join(formatted_reviews)
+    async def run_group(client, model: str, idxs: List[int]):
+        try:
+            grouped = await get_grouped_reviews_async(client, content, model, idxs)
+            return [(idx, grouped[idx], True) for idx in idxs]
+        except Exception:
+            # Batched path failed (refused JSON, transport error, ...):
+            # fall back to one call per reviewer, which has its own retries
+            return list(await asyncio.gather(
+                *(run_review(client, i, REVIEWERS[i]) for i in idxs)
+            ))
+
+    # Reviewers sharing a model ride one batched request; the rest go solo
+    by_model: Dict[str, List[int]] = {}
+    for i, reviewer in enumerate(REVIEWERS):
+        if i not in done:
+            by_model.setdefault(reviewer['model'], []).append(i)
+
+    # One TCP+TLS connection; every in-flight call rides it as its own
+    # HTTP/2 stream, so there are no per-call handshakes and no HTTP/1.1
+    # head-of-line blocking across the fan-out
+    limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+    with partial_path.open('a', encoding='utf-8') as log:
+        async with httpx.AsyncClient(http2=True, limits=limits,
+                                     timeout=180.0,  # longer timeout for complex analysis
+                                     headers=openrouter_headers()) as client:
+            tasks = [
+                asyncio.create_task(
+                    run_group(client, model, idxs) if len(idxs) > 1
+                    else run_single(client, idxs[0])
+                )
+                for model, idxs in by_model.items()
+            ]
+            for finished in asyncio.as_completed(tasks):
+                for idx, review, ok in await finished:
+                    reviews[idx] = review
+                    reviewer = REVIEWERS[idx]
+                    model_short = reviewer['model'].split('/')[-1]
+                    name = reviewer.get('name', reviewer['persona'][:40])
+                    if ok:
+                        print(f"  [{idx+1:2}/12] {name}: Complete ({model_short})")
+                        # Persist immediately; only successes are logged so
+                        # failed slots get retried on resume
+                        log.write(_json_dumps({
+                            "idx": idx,
+                            "doc": doc_hash,
+                            "model": reviewer['model'],
+                            "review": review
+                        }).decode('utf-8') + "\n")
+                        log.flush()
+                    else:
+                        print(f"  [{idx+1:2}/12] {name}: {review}")
+    return reviews
+
+
+def _collect_reviews_threaded(content: str) -> List[str]:
+    """Thread-pool fallback for the collection phase when httpx is absent.
+
+    requests.post releases the GIL during socket I/O, so twelve threads
+    over the shared pooled SESSION get essentially the same wall-time win
+    as the async path, minus same-model batching and resumable partial
+    logs.
+    """
+    reviews: List[str] = [""] * len(REVIEWERS)
+    with ThreadPoolExecutor(max_workers=len(REVIEWERS)) as executor:
+        futures = {executor.submit(get_review, content, reviewer): (i, reviewer)
+                   for i, reviewer in enumerate(REVIEWERS)}
+        for future in as_completed(futures):
+            i, reviewer = futures[future]
+            model_short = reviewer['model'].split('/')[-1]
+            name = reviewer.get('name', reviewer['persona'][:40])
+            try:
+                reviews[i] = future.result()
+                print(f"  [{i+1:2}/12] {name}: Complete ({model_short})")
+            except Exception as e:
+                reviews[i] = f"Review failed: {e}"
+                print(f"  [{i+1:2}/12] {name}: Review failed: {e}")
+    return reviews
+
+
+# Typed synthesis verdict, so the pass/fail decision is a schema-enforced
+# enum field instead of a keyword scan over the whole synthesis text
+# (which false-positived on headings like "STEEL MANNED VERSION")
+VERDICT_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "TrialVerdict",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "verdict": {"type": "string", "enum": ["PASS", "REVISE", "REJECT"]},
+                "tech_stars": {"type": "integer", "minimum": 1, "maximum": 5},
+                "logic_stars": {"type": "integer", "minimum": 1, "maximum": 5},
+                "ethics_stars": {"type": "integer", "minimum": 1, "maximum": 5},
+                "feasibility_stars": {"type": "integer", "minimum": 1, "maximum": 5},
+                "novelty_stars": {"type": "integer", "minimum": 1, "maximum": 5},
+                "markdown": {"type": "string"}
+            },
+            "required": ["verdict", "markdown"]
+        }
+    }
+}
+
+
+# Precompiled parsers for the rubric lines in the synthesis markdown, used
+# when a provider ignores the json_schema and to backfill the star ratings
+VERDICT_RE = re.compile(r"\*\*Overall:\*\*\s*(PASS|REVISE|REJECT)")
+STAR_RE = re.compile(
+    r"\*\*(Technical Quality|Logical Coherence|Ethical Alignment|Feasibility|Novelty):\*\*\s*(\d)"
+)
+
+# Schema star fields -> rubric labels, for the typed path
+STAR_FIELDS = {
+    "tech_stars": "Technical Quality",
+    "logic_stars": "Logical Coherence",
+    "ethics_stars": "Ethical Alignment",
+    "feasibility_stars": "Feasibility",
+    "novelty_stars": "Novelty",
+}
+
+
+def synthesize_reviews(reviews: List[str], reviewer_info: List[Dict], synthesis_model: str = "anthropic/claude-opus-4.5") -> Dict:
+    """Synthesize all reviews into actionable summary using Opus 4.5.
+
+    Returns a dict with a schema-typed "verdict" (PASS/REVISE/REJECT),
+    the five star ratings, and the full rendered summary under "markdown".
+    """
+    # Format reviews with reviewer identity; the generator feeds join
+    # directly so the formatted copies never coexist as a list
+    combined = "\n\n---REVIEW---\n\n".join(
+        f"### {reviewer.get('name', f'Reviewer {i+1}')}\n{review}"
+        for i, (review, reviewer) in enumerate(zip(reviews, reviewer_info))
+    )
 
     messages = [
         {
@@ -558,7 +1312,12 @@ OUTPUT FORMAT:
 2. [Second priority]
 3. [Third priority]
 
-Remove any credentialism-based dismissals. Focus on substance."""
+Remove any credentialism-based dismissals. Focus on substance.
+
+Respond with a JSON object: "verdict" (PASS, REVISE or REJECT), the five star
+ratings as integers 1-5 ("tech_stars", "logic_stars", "ethics_stars",
+"feasibility_stars", "novelty_stars"), and "markdown" holding the full summary
+in the OUTPUT FORMAT above."""
         },
         {
             "role": "user",
@@ -566,7 +1325,29 @@ Remove any credentialism-based dismissals. Focus on substance."""
         }
     ]
 
-    return openrouter_request(synthesis_model, messages, max_tokens=3000)
+    raw = openrouter_request(synthesis_model, messages, max_tokens=3000,
+                             response_format=VERDICT_SCHEMA)
+    try:
+        result = _json_loads(raw)
+        if result.get("verdict") not in ("PASS", "REVISE", "REJECT"):
+            raise ValueError("missing verdict field")
+        result.setdefault("markdown", raw)
+    except ValueError:
+        # Provider ignored the schema; parse the rubric line instead of
+        # scanning (and copying) the whole text with .upper()
+        match = VERDICT_RE.search(raw)
+        result = {
+            "verdict": match.group(1) if match else "REVISE",
+            "markdown": raw
+        }
+
+    # Star ratings: prefer the typed fields, else parse the rubric lines
+    stars = {label: int(result[field])
+             for field, label in STAR_FIELDS.items() if field in result}
+    if not stars:
+        stars = {label: int(n) for label, n in STAR_RE.findall(result["markdown"])}
+    result["stars"] = stars
+    return result
 
 
 def trial_by_hex_plus(input_file: str, output_file: str) -> Dict:
@@ -594,7 +1375,13 @@ def trial_by_hex_plus(input_file: str, output_file: str) -> Dict:
         print(f"ERROR: Input file not found: {input_path}")
         return {"passed": False, "synthesis": "Input file not found"}
 
-    content = input_path.read_text(encoding='utf-8')
+    # Read as bytes and decode explicitly: skips the universal-newlines
+    # layer, and the fadvise hint tells the kernel to read ahead
+    # sequentially for thesis-scale inputs
+    with input_path.open('rb') as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        content = f.read().decode('utf-8')
 
     print("=" * 70)
     print("  TRIAL BY HEX+ - Enhanced Multi-Model Blind Peer Review")
@@ -608,53 +1395,41 @@ def trial_by_hex_plus(input_file: str, output_file: str) -> Dict:
     print(f"\nPlus Reviewers (7-12):")
     for i, r in enumerate(PLUS_REVIEWERS):
         print(f"   [{i+7}] {r['name']}")
-    print(f"\nCollecting 12 specialized blind reviews...\n")
-
-    reviews = []
-    for i, reviewer in enumerate(REVIEWERS):
-        model_short = reviewer['model'].split('/')[-1]
-        name = reviewer.get('name', reviewer['persona'][:40])
-        print(f"  [{i+1:2}/12] {name}...")
-        try:
-            review = get_review(content, reviewer)
-            reviews.append(review)
-            print(f"          Complete ({model_short})")
-        except Exception as e:
-            print(f"          Error: {e}")
-            reviews.append(f"Review failed: {e}")
-
-    print("\nSynthesizing 12 reviews with Claude Opus 4.5...")
-    synthesis = synthesize_reviews(reviews, REVIEWERS)
+    # One cheap health probe before the fan-out; reviewers whose primary
+    # model is down get rerouted once instead of each paying the cascade
+    available = get_available_models()
+    if available:
+        for missing in sorted({r['model'] for r in REVIEWERS} - available):
+            print(f"  NOTE: {missing} unavailable; rerouting its reviewers")
 
-    # Determine verdict
-    passed = "PASS" in synthesis.upper() and "REJECT" not in synthesis.upper()
+    print(f"\nCollecting 12 specialized blind reviews concurrently...\n")
 
-    # Resolve output path
+    # Resolve output path up front; completed reviews stream to a
+    # .partial.jsonl sidecar next to it for crash resumability
     output_path = Path(output_file).resolve()
-
-    # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Build individual reviews section
-    individual_reviews = ""
-    for i, (review, reviewer) in enumerate(zip(reviews, REVIEWERS)):
-        name = reviewer.get('name', f"Reviewer {i+1}")
-        persona = reviewer.get('persona', '')[:200]
-        individual_reviews += f"""### {i+1}. {name}
-**Model:** {reviewer['model']}
-**Focus:** {persona[:100]}{"..." if len(persona) > 100 else ""}
-
-{review}
+    partial_path = output_path.with_suffix('.partial.jsonl')
+    if httpx is not None:
+        reviews = asyncio.run(_collect_reviews(content, partial_path))
+    else:
+        reviews = _collect_reviews_threaded(content)
 
----
+    print("\nSynthesizing 12 reviews with Claude Opus 4.5...")
+    result = synthesize_reviews(reviews, REVIEWERS)
+    synthesis = result["markdown"]
 
-"""
+    # Verdict is a typed field from the synthesis schema, not a keyword scan
+    passed = result["verdict"] == "PASS"
 
-    output_path.write_text(f"""# Trial by Hex+ Review
+    # Render the report into one buffer and write it in a single binary
+    # pass, so the largest strings are never re-copied through an f-string
+    buf = io.StringIO()
+    buf.write(f"""# Trial by Hex+ Review
 
 **Document:** {input_path.name}
 **Date:** {datetime.now().isoformat()}
-**Verdict:** {"PASSED" if passed else "NEEDS REVISION"}
+**Verdict:** {result["verdict"]}
 **Reviewers:** 12 specialized AI reviewers via OpenRouter
 
 ---
@@ -667,15 +1442,33 @@ def trial_by_hex_plus(input_file: str, output_file: str) -> Dict:
 
 ## Individual Reviews
 
-{individual_reviews}
-""", encoding='utf-8')
+""")
+    for i, (review, reviewer) in enumerate(zip(reviews, REVIEWERS)):
+        name = reviewer.get('name', f"Reviewer {i+1}")
+        persona = reviewer.get('persona', '')[:200]
+        buf.write(f"""### {i+1}. {name}
+**Model:** {reviewer['model']}
+**Focus:** {persona[:100]}{"..." if len(persona) > 100 else ""}
+
+{review}
+
+---
+
+""")
+    output_path.write_bytes(buf.getvalue().encode('utf-8'))
+
+    # The run completed and the report is on disk; drop the crash-resume
+    # sidecar so the next run collects fresh reviews instead of replaying
+    # this one's
+    partial_path.unlink(missing_ok=True)
 
     print(f"\n{'=' * 70}")
     print(f"  Review saved to: {output_path}")
-    print(f"  Verdict: {'PASSED' if passed else 'NEEDS REVISION'}")
+    print(f"  Verdict: {result['verdict']}")
     print(f"{'=' * 70}")
 
-    return {"passed": passed, "synthesis": synthesis}
+    return {"passed": passed, "verdict": result["verdict"],
+            "stars": result["stars"], "synthesis": synthesis}
 
 
 def print_usage():
@@ -684,10 +1477,12 @@ def print_usage():
     print("  TRIAL BY HEX+ - Enhanced Multi-Model Blind Peer Review")
     print("  12 Specialized Reviewers for Rigorous Analysis")
     print("=" * 70)
-    print("\nUsage: python trial_by_hex_plus.py <input_file> <output_file>")
+    print("\nUsage: python trial_by_hex_plus.py <input_file> <output_file> [--no-cache]")
     print("\nExamples:")
     print('  python trial_by_hex_plus.py ./thesis.md ./thesis_review.md')
     print('  python trial_by_hex_plus.py "path/to/document.txt" "path/to/review.md"')
+    print("\nOptions:")
+    print("  --no-cache   Force fresh reviews even when TRIAL_BY_HEX_CACHE=1")
     print("\nOriginal Reviewers (1-6):")
     for i, r in enumerate(ORIGINAL_REVIEWERS):
         print(f"  {i+1}. {r['model']}")
@@ -699,12 +1494,18 @@ def print_usage():
     print("\nSetup:")
     print("  1. pip install -r requirements.txt")
     print("  2. Set OPENROUTER_API_KEY (env var or .env file)")
+    print("     Multiple keys: OPENROUTER_API_KEYS=key1,key2,... (round-robined")
+    print("     across requests for higher aggregate rate limits)")
     print("\nGet your API key at: https://openrouter.ai")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
         print_usage()
         sys.exit(1)
 
-    trial_by_hex_plus(sys.argv[1], sys.argv[2])
+    if "--no-cache" in sys.argv:
+        CACHE_BYPASS = True
+
+    trial_by_hex_plus(args[0], args[1])